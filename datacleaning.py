@@ -6,12 +6,118 @@ This script encapsulates a full data processing workflow into a reusable class.
 It performs cleaning, generates advanced static visualizations, creates an
 interactive HTML dashboard with Plotly, and produces an automated PDF report.
 """
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+import pyarrow.compute as pc
 import seaborn as sns
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import plotly.express as px
-from fpdf import FPDF
+import plotly.graph_objects as go
+import plotly.io as pio
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Image, PageBreak, Paragraph, Preformatted, SimpleDocTemplate, Spacer
+from pypdf import PdfWriter
+import datetime
+import functools
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import polars as pl
+except ImportError:  # optional: only speeds up CSV output
+    pl = None
+
+# Copy-on-Write is always on from pandas 3.0; opt in explicitly on 2.x
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Expected schema of the input CSV; only these columns are read.
+COLUMN_TYPES = {
+    'ID': pa.int64(),
+    'Name': pa.string(),
+    'Email': pa.string(),
+    'PhoneNumber': pa.string(),
+    'Age': pa.float32(),
+    'Country': pa.string(),
+    'Salary': pa.float32(),
+    'JoiningDate': pa.string(),
+}
+# Date columns, read as text and parsed leniently so a bad cell becomes null.
+DATE_COLUMNS = ['JoiningDate']
+# Column that identifies a record; rows sharing it are duplicates.
+PRIMARY_KEY = ['ID']
+# Text columns held as categoricals during cleaning and plotting.
+CATEGORICAL_COLUMNS = ('Name', 'Email', 'PhoneNumber', 'Country')
+# Resolution of the static PNGs; the report embeds them at 180mm wide.
+DPI = 150
+# Static visualizations, in the order they appear in the PDF report.
+VIZ_FILES = [
+    'age_distribution.png', 'salary_distribution.png',
+    'country_pie_chart.png', 'correlation_heatmap.png'
+]
+
+def _init_plot_worker():
+    """Applies the seaborn theme in a plotting worker process."""
+    sns.set_theme(style="whitegrid")
+
+@functools.lru_cache(maxsize=32)
+def _viridis(k):
+    """Returns k colors sampled from the viridis colormap."""
+    return tuple(sns.color_palette("viridis", k))
+
+def _plot_age(df, path):
+    """Saves a histogram of employee ages."""
+    fig = Figure(figsize=(10, 6), dpi=DPI)
+    ax = fig.subplots()
+    sns.histplot(df['Age'], bins=15, kde=True, color='skyblue', ax=ax)
+    ax.set_title('Age Distribution of Employees', fontsize=16)
+    FigureCanvasAgg(fig).print_png(path)
+
+def _plot_salary(df, path):
+    """Saves a histogram of employee salaries."""
+    fig = Figure(figsize=(10, 6), dpi=DPI)
+    ax = fig.subplots()
+    sns.histplot(df['Salary'], bins=15, kde=True, color='lightgreen', ax=ax)
+    ax.set_title('Salary Distribution of Employees', fontsize=16)
+    FigureCanvasAgg(fig).print_png(path)
+
+def _plot_country(country_counts, path):
+    """Saves a pie chart of employee counts per country."""
+    fig = Figure(figsize=(10, 8), dpi=DPI)
+    ax = fig.subplots()
+    ax.pie(country_counts, labels=country_counts.index, autopct='%1.1f%%', startangle=140, colors=_viridis(len(country_counts)))
+    ax.set_title('Employee Distribution by Country', fontsize=16)
+    ax.set_ylabel('')
+    FigureCanvasAgg(fig).print_png(path)
+
+def _plot_corr(corr, path):
+    """Saves a heatmap of a correlation matrix."""
+    fig = Figure(figsize=(8, 6), dpi=DPI)
+    ax = fig.subplots()
+    sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
+    ax.set_title('Correlation Heatmap of Numerical Features', fontsize=16)
+    FigureCanvasAgg(fig).print_png(path)
+
+def _histogram_figure(values, nbins, title, label):
+    """Builds a Plotly histogram whose bins are computed server-side with NumPy."""
+    counts, edges = np.histogram(values, bins=nbins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=title, xaxis_title=label, yaxis_title='count', bargap=0)
+    return fig
+
+def _report_document(target):
+    """Creates an A4 report document with 10mm margins, written to a path or buffer."""
+    return SimpleDocTemplate(
+        target, pagesize=A4,
+        leftMargin=10 * mm, rightMargin=10 * mm, topMargin=10 * mm, bottomMargin=10 * mm,
+    )
 
 class DataProcessor:
     """A class to handle the data cleaning, visualization, and reporting pipeline."""
@@ -21,10 +127,16 @@ class DataProcessor:
         self.input_file = input_file
         self.raw_df = None
         self.cleaned_df = None
+        self.n_initial = None
+        self.n_after_dedup = None
+        self.describe_text = None
+        self.country_counts = None
         self.output_dir = "output"
         self.viz_dir = os.path.join(self.output_dir, "visualizations")
         self.dashboard_file = os.path.join(self.output_dir, "interactive_dashboard.html")
         self.report_file = os.path.join(self.output_dir, "summary_report.pdf")
+        self.report_template_file = os.path.join(self.output_dir, "report_visualizations.pdf")
+        self.cleaned_data_file = os.path.join(self.output_dir, "cleaned_data.parquet")
         
         # Create output directories if they don't exist
         os.makedirs(self.viz_dir, exist_ok=True)
@@ -34,7 +146,19 @@ class DataProcessor:
     def load_data(self):
         """Loads data from the input CSV file."""
         try:
-            self.raw_df = pd.read_csv(self.input_file)
+            table = pa_csv.read_csv(
+                self.input_file,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=COLUMN_TYPES,
+                    include_columns=list(COLUMN_TYPES),
+                    strings_can_be_null=True,
+                ),
+            )
+            for col in DATE_COLUMNS:
+                dates = pc.strptime(table[col], format='%Y-%m-%d', unit='s', error_is_null=True)
+                table = table.set_column(table.schema.get_field_index(col), col, dates.cast(pa.date32()))
+            # Keep every column in Arrow buffers, freeing the table as it converts
+            self.raw_df = table.combine_chunks().to_pandas(types_mapper=pd.ArrowDtype, self_destruct=True)
             print(f"Successfully loaded data from {self.input_file}")
         except FileNotFoundError:
             print(f"Error: The file {self.input_file} was not found.")
@@ -46,25 +170,48 @@ class DataProcessor:
             print("No data to clean.")
             return
 
-        df = self.raw_df.copy()
-        df.drop_duplicates(inplace=True)
+        # raw_df stays untouched; only the recast and mutated columns get copied
+        df = self.raw_df.astype({col: 'category' for col in CATEGORICAL_COLUMNS})
+        # Rows without a key can only be duplicates of an identical row
+        duplicated = df.duplicated(subset=PRIMARY_KEY, keep='first')
+        unkeyed = df[PRIMARY_KEY].isna().any(axis=1)
+        if unkeyed.any():
+            duplicated[unkeyed] = df[unkeyed].duplicated(keep='first').to_numpy()
+        df = df[~duplicated]
+        self.n_initial = len(self.raw_df)
+        self.n_after_dedup = len(df)
 
+        means = df[['Age', 'Salary']].astype('float64').mean()
         fill_values = {
             'Name': 'Unknown',
             'Email': 'missing@email.com',
             'PhoneNumber': 'Unavailable',
-            'Age': df['Age'].mean(),
+            'Age': means['Age'],
             'Country': 'Unknown',
-            'Salary': df['Salary'].mean(),
-            'JoiningDate': pd.to_datetime('2025-01-04')
+            'Salary': means['Salary'],
+            'JoiningDate': datetime.date(2025, 1, 4)
         }
+        # A categorical only accepts fill values that are among its categories
+        for col in CATEGORICAL_COLUMNS:
+            if df[col].isna().any() and fill_values[col] not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories([fill_values[col]])
         df.fillna(value=fill_values, inplace=True)
         
-        df['Age'] = df['Age'].round().astype(int)
-        df['Salary'] = df['Salary'].round().astype(int)
-        df['JoiningDate'] = pd.to_datetime(df['JoiningDate'], errors='coerce')
+        # Round with NumPy, then hand the integers back to Arrow without copying
+        df['Age'] = pd.array(np.rint(df['Age'].to_numpy()).astype(np.int16), dtype=pd.ArrowDtype(pa.int16()))
+        df['Salary'] = pd.array(np.rint(df['Salary'].to_numpy()).astype(np.int32), dtype=pd.ArrowDtype(pa.int32()))
         
+        # Employees per country, counted straight from the categorical codes
+        country = df['Country'].cat
+        counts = pd.Series(
+            np.bincount(country.codes, minlength=len(country.categories)),
+            index=pd.Index(country.categories, name='Country'),
+            name='count',
+        )
+        self.country_counts = counts[counts > 0].sort_values(ascending=False)
+
         self.cleaned_df = df
+        self.describe_text = None
         print("Data cleaning complete.")
 
     def create_static_visualizations(self):
@@ -73,40 +220,25 @@ class DataProcessor:
             print("No cleaned data available for visualization.")
             return
         
-        sns.set_theme(style="whitegrid")
-        
-        # Age Distribution
-        plt.figure(figsize=(10, 6))
-        sns.histplot(self.cleaned_df['Age'], bins=15, kde=True, color='skyblue')
-        plt.title('Age Distribution of Employees', fontsize=16)
-        plt.savefig(os.path.join(self.viz_dir, 'age_distribution.png'), dpi=300)
-        plt.close()
-
-        # Salary Distribution
-        plt.figure(figsize=(10, 6))
-        sns.histplot(self.cleaned_df['Salary'], bins=15, kde=True, color='lightgreen')
-        plt.title('Salary Distribution of Employees', fontsize=16)
-        plt.savefig(os.path.join(self.viz_dir, 'salary_distribution.png'), dpi=300)
-        plt.close()
-
-        # Country Pie Chart
-        country_counts = self.cleaned_df['Country'].value_counts()
-        plt.figure(figsize=(10, 8))
-        plt.pie(country_counts, labels=country_counts.index, autopct='%1.1f%%', startangle=140, colors=sns.color_palette("viridis", len(country_counts)))
-        plt.title('Employee Distribution by Country', fontsize=16)
-        plt.ylabel('')
-        plt.savefig(os.path.join(self.viz_dir, 'country_pie_chart.png'), dpi=300)
-        plt.close()
-
-        # Correlation Heatmap
-        plt.figure(figsize=(8, 6))
-        numerical_df = self.cleaned_df.select_dtypes(include=['number'])
-        corr = numerical_df.corr()
-        sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f")
-        plt.title('Correlation Heatmap of Numerical Features', fontsize=16)
-        plt.savefig(os.path.join(self.viz_dir, 'correlation_heatmap.png'), dpi=300)
-        plt.close()
-        
+        numeric_columns = ['Age', 'Salary']
+        arr = np.ascontiguousarray(self.cleaned_df[numeric_columns].to_numpy(dtype=np.float32))
+        corr = pd.DataFrame(np.corrcoef(arr, rowvar=False), index=numeric_columns, columns=numeric_columns)
+        plots = [
+            (_plot_age, self.cleaned_df[['Age']], 'age_distribution.png'),
+            (_plot_salary, self.cleaned_df[['Salary']], 'salary_distribution.png'),
+            (_plot_country, self.country_counts, 'country_pie_chart.png'),
+            (_plot_corr, corr, 'correlation_heatmap.png'),
+        ]
+
+        # Each figure is rendered and PNG-encoded in its own process
+        with ProcessPoolExecutor(max_workers=len(plots), initializer=_init_plot_worker) as executor:
+            futures = [
+                executor.submit(plot, data, os.path.join(self.viz_dir, filename))
+                for plot, data, filename in plots
+            ]
+            for future in futures:
+                future.result()
+
         print(f"Static visualizations saved to {self.viz_dir}")
 
     def create_interactive_dashboard(self):
@@ -114,23 +246,23 @@ class DataProcessor:
         if self.cleaned_df is None:
             return
 
-        with open(self.dashboard_file, 'w') as f:
+        with open(self.dashboard_file, 'w', buffering=1 << 20) as f:
             f.write("<html><head><title>Interactive Data Dashboard</title></head><body>\n")
             f.write("<h1>Employee Data Interactive Dashboard</h1>\n")
             
-            # Interactive Histogram of Age
-            fig_age = px.histogram(self.cleaned_df, x="Age", nbins=20, title="Interactive Age Distribution")
-            f.write(fig_age.to_html(full_html=False, include_plotlyjs='cdn'))
+            # Interactive Histogram of Age (also loads plotly.js for the whole page)
+            fig_age = _histogram_figure(self.cleaned_df['Age'].to_numpy(), 20, "Interactive Age Distribution", "Age")
+            pio.write_html(fig_age, f, full_html=False, include_plotlyjs='cdn')
             
             # Interactive Histogram of Salary
-            fig_salary = px.histogram(self.cleaned_df, x="Salary", nbins=20, title="Interactive Salary Distribution")
-            f.write(fig_salary.to_html(full_html=False, include_plotlyjs='cdn'))
+            fig_salary = _histogram_figure(self.cleaned_df['Salary'].to_numpy(), 20, "Interactive Salary Distribution", "Salary")
+            pio.write_html(fig_salary, f, full_html=False, include_plotlyjs=False)
 
             # Interactive Bar Chart for Country
-            country_counts = self.cleaned_df['Country'].value_counts().reset_index()
+            country_counts = self.country_counts.reset_index()
             country_counts.columns = ['Country', 'Count']
             fig_country = px.bar(country_counts, x='Country', y='Count', title="Interactive Employee Count by Country")
-            f.write(fig_country.to_html(full_html=False, include_plotlyjs='cdn'))
+            pio.write_html(fig_country, f, full_html=False, include_plotlyjs=False)
 
             f.write("</body></html>\n")
         
@@ -141,69 +273,102 @@ class DataProcessor:
         if self.cleaned_df is None:
             return
             
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", 'B', 16)
-        
-        # Title
-        pdf.cell(0, 10, 'Data Cleaning and Visualization Report', 0, 1, 'C')
-        pdf.ln(10)
-        
-        # Summary
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, '1. Data Cleaning Summary', 0, 1)
-        pdf.set_font("Arial", '', 10)
-        pdf.multi_cell(0, 5, 
-            f"Input file: {self.input_file}\n"
-            f"Initial records: {len(self.raw_df)}\n"
-            f"Records after dropping duplicates: {len(self.raw_df.drop_duplicates())}\n"
-            f"Final cleaned records: {len(self.cleaned_df)}\n"
-        )
-        pdf.ln(5)
-        
-        # Data Description
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, '2. Cleaned Data Statistics', 0, 1)
-        pdf.set_font("Arial", '', 8)
-        desc_text = self.cleaned_df.describe().to_string()
-        pdf.multi_cell(0, 5, desc_text)
-        pdf.ln(5)
-
-        # Visualizations
-        pdf.add_page()
-        pdf.set_font("Arial", 'B', 12)
-        pdf.cell(0, 10, '3. Visualizations', 0, 1)
-        
-        viz_files = [
-            'age_distribution.png', 'salary_distribution.png',
-            'country_pie_chart.png', 'correlation_heatmap.png'
+        styles = getSampleStyleSheet()
+        story = [
+            # Title
+            Paragraph('Data Cleaning and Visualization Report', styles['Title']),
+
+            # Summary
+            Paragraph('1. Data Cleaning Summary', styles['Heading2']),
+            Preformatted(
+                f"Input file: {self.input_file}\n"
+                f"Initial records: {self.n_initial}\n"
+                f"Records after dropping duplicates: {self.n_after_dedup}\n"
+                f"Final cleaned records: {len(self.cleaned_df)}",
+                styles['Normal'],
+            ),
+            Spacer(1, 5 * mm),
         ]
-        
-        for i, viz_file in enumerate(viz_files):
-            if i % 2 == 0 and i != 0:
-                pdf.add_page() # Add new page for every two images
-            
-            pdf.image(os.path.join(self.viz_dir, viz_file), w=180)
-            pdf.ln(5)
 
-        pdf.output(self.report_file)
+        # Data Description
+        if self.describe_text is None:
+            self.describe_text = self.cleaned_df.describe().to_string()
+        story.append(Paragraph('2. Cleaned Data Statistics', styles['Heading2']))
+        story.append(Preformatted(self.describe_text, styles['Code']))
+
+        summary = io.BytesIO()
+        _report_document(summary).build(story)
+
+        # Visualizations come from a cached template PDF, rebuilt only when stale
+        if not self._report_template_is_current():
+            self._build_report_template()
+
+        writer = PdfWriter()
+        writer.append(summary)
+        writer.append(self.report_template_file)
+        writer.write(self.report_file)
         print(f"PDF report saved to {self.report_file}")
 
-    def save_cleaned_data(self, output_file="cleaned_data.csv"):
-        """Saves the cleaned DataFrame to a CSV file."""
+    def _report_template_is_current(self):
+        """Checks whether the cached visualization pages are newer than their sources."""
+        if not os.path.exists(self.report_template_file):
+            return False
+        sources = [self.input_file] + [os.path.join(self.viz_dir, f) for f in VIZ_FILES]
+        template_mtime = os.path.getmtime(self.report_template_file)
+        return all(os.path.getmtime(src) <= template_mtime for src in sources)
+
+    def _build_report_template(self):
+        """Builds the visualization pages of the report into the template PDF."""
+        story = [Paragraph('3. Visualizations', getSampleStyleSheet()['Heading2'])]
+
+        for i, viz_file in enumerate(VIZ_FILES):
+            if i % 2 == 0 and i != 0:
+                story.append(PageBreak()) # Add new page for every two images
+
+            path = os.path.join(self.viz_dir, viz_file)
+            width, height = ImageReader(path).getSize()
+            story.append(Image(path, width=180 * mm, height=180 * mm * height / width))
+            story.append(Spacer(1, 5 * mm))
+
+        _report_document(self.report_template_file).build(story)
+
+    def save_cleaned_data(self, output_file=None):
+        """Saves the cleaned DataFrame as Parquet (CSV for a .csv name), by default to cleaned_data_file."""
         if self.cleaned_df is not None:
-            path = os.path.join(self.output_dir, output_file)
-            self.cleaned_df.to_csv(path, index=False)
+            path = self.cleaned_data_file if output_file is None else os.path.join(self.output_dir, output_file)
+            if path.endswith('.csv') and pl is not None:
+                pl.from_pandas(self.cleaned_df).write_csv(path)
+            elif path.endswith('.csv'):
+                self.cleaned_df.to_csv(path, index=False)
+            else:
+                self.cleaned_df.to_parquet(path, engine='pyarrow', compression='zstd', index=False, use_dictionary=True)
             print(f"Cleaned data saved to {path}")
 
+    def _stale(self, out_path):
+        """Checks whether an output file is missing or older than the input file."""
+        return not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(self.input_file)
+
     def run_pipeline(self):
-        """Executes the full data processing pipeline."""
+        """Executes the pipeline, skipping stages whose outputs are up to date."""
         if self.raw_df is not None:
+            viz_stale = any(self._stale(os.path.join(self.viz_dir, f)) for f in VIZ_FILES)
+            dashboard_stale = self._stale(self.dashboard_file)
+            # The report embeds the PNGs, so it is rebuilt whenever they are
+            report_stale = self._stale(self.report_file) or viz_stale
+            data_stale = self._stale(self.cleaned_data_file)
+            if not (viz_stale or dashboard_stale or report_stale or data_stale):
+                print("All outputs are up to date; nothing to do.")
+                return
+
             self.clean_data()
-            self.create_static_visualizations()
-            self.create_interactive_dashboard()
-            self.generate_pdf_report()
-            self.save_cleaned_data()
+            if viz_stale:
+                self.create_static_visualizations()
+            if dashboard_stale:
+                self.create_interactive_dashboard()
+            if report_stale:
+                self.generate_pdf_report()
+            if data_stale:
+                self.save_cleaned_data()
             print("\nPipeline executed successfully!")
 
 if __name__ == '__main__':